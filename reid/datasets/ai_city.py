@@ -4,7 +4,8 @@ import os.path as osp
 import re
 import xml.dom.minidom as XD
 from collections import defaultdict
-from glob import glob
+
+from ..utils.osutils import sorted_jpgs
 
 
 class AI_City(object):
@@ -63,9 +64,7 @@ class AI_City(object):
         ret = []
         if path is None:
             return ret, int(len(all_pids))
-        fpaths = sorted(glob(osp.join(path, '*.jpg')))
-        for fpath in fpaths:
-            fname = osp.basename(fpath)
+        for fname in sorted_jpgs(path):
             if type == 'tracking_det':
                 cam, frame = map(int, pattern.search(fname).groups())
                 pid = 1
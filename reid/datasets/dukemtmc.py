@@ -2,7 +2,8 @@ from __future__ import print_function, absolute_import
 
 import os.path as osp
 import re
-from glob import glob
+
+from ..utils.osutils import sorted_jpgs
 
 
 class DukeMTMC(object):
@@ -54,16 +55,23 @@ class DukeMTMC(object):
         if type == 'tracking_gt':
             fpaths = []
             for iCam in self.iCams:
-                fpaths += sorted(glob(osp.join(path, 'camera' + str(iCam), '*.jpg')))
+                cam_dir = osp.join(path, 'camera' + str(iCam))
+                fpaths += [osp.join(cam_dir, fname) for fname in sorted_jpgs(cam_dir)]
         else:
-            fpaths = sorted(glob(osp.join(path, '*.jpg')))
+            fpaths = [osp.join(path, fname) for fname in sorted_jpgs(path)]
         for fpath in fpaths:
             fname = osp.basename(fpath)
             if type == 'tracking_det':
                 cam, frame = map(int, pattern.search(fname).groups())
                 pid = 8000
             else:
-                pid, cam = map(int, pattern.search(fname).groups())
+                try:
+                    # fast path for the fixed 'PID_cCAM...' layout; regex only as fallback
+                    parts = fname.split('_', 2)
+                    pid = int(parts[0])
+                    cam = int(parts[1][1:].partition('s')[0])
+                except (IndexError, ValueError):
+                    pid, cam = map(int, pattern.search(fname).groups())
             if type == 'tracking_gt':
                 fname = osp.join('camera' + str(cam), osp.basename(fpath))
             if pid == -1: continue
@@ -2,7 +2,8 @@ from __future__ import print_function, absolute_import
 
 import os.path as osp
 import re
-from glob import glob
+
+from ..utils.osutils import sorted_jpgs
 
 
 class VeRi(object):
@@ -22,10 +23,14 @@ class VeRi(object):
         pattern = re.compile(r'(\d+)_c(\d+)')
         all_pids = {}
         ret = []
-        fpaths = sorted(glob(osp.join(path, '*.jpg')))
-        for fpath in fpaths:
-            fname = osp.basename(fpath)
-            pid, cam = map(int, pattern.search(fname).groups())
+        for fname in sorted_jpgs(path):
+            try:
+                # fast path for the fixed 'PID_cCAM...' layout; regex only as fallback
+                parts = fname.split('_', 2)
+                pid = int(parts[0])
+                cam = int(parts[1][1:].partition('s')[0])
+            except (IndexError, ValueError):
+                pid, cam = map(int, pattern.search(fname).groups())
             if pid == -1: continue
             if pid not in all_pids:
                 all_pids[pid] = len(all_pids)
@@ -2,6 +2,9 @@ from __future__ import absolute_import
 
 import torch
 from torch import nn
+from torch.nn import functional as F
+
+from .triplet_kernel import hard_example_mining_cuda, mining_available
 
 
 def normalize(x, axis=-1):
@@ -11,8 +14,12 @@ def normalize(x, axis=-1):
     Returns:
         x: pytorch Variable, same shape as input
     """
-    x = 1. * x / (torch.norm(x, 2, axis, keepdim=True).expand_as(x) + 1e-12)
-    return x
+    return F.normalize(x, p=2, dim=axis, eps=1e-12)
+
+
+# torch.cdist (PyTorch >= 1.1) dispatches to a fused vendor GEMM path;
+# keep the manual implementation for older installs
+_HAS_CDIST = hasattr(torch, 'cdist')
 
 
 def euclidean_dist(x, y):
@@ -23,11 +30,14 @@ def euclidean_dist(x, y):
     Returns:
         dist: pytorch Variable, with shape [m, n]
     """
-    m, n = x.size(0), y.size(0)
-    xx = torch.pow(x, 2).sum(1, keepdim=True).expand(m, n)
-    yy = torch.pow(y, 2).sum(1, keepdim=True).expand(n, m).t()
-    dist = xx + yy
-    dist.addmm_(1, -2, x, y.t())
+    if _HAS_CDIST:
+        # clamp out-of-place: autograd saves cdist's output for backward, so
+        # an in-place clamp_min_ would fail the version-counter check
+        return torch.cdist(x, y, p=2).clamp(min=1e-12)
+    xx = (x * x).sum(1, keepdim=True)
+    yy = (y * y).sum(1, keepdim=True).t()
+    dist = xx + yy  # broadcasts to [m, n]
+    dist.addmm_(x, y.t(), beta=1, alpha=-2)
     dist = dist.clamp(min=1e-12).sqrt()  # for numerical stability
     return dist
 
@@ -45,37 +55,40 @@ def hard_example_mining(dist_mat, labels, return_inds=False):
             indices of selected hard positive samples; 0 <= p_inds[i] <= N - 1
         n_inds: pytorch LongTensor, with shape [N];
             indices of selected hard negative samples; 0 <= n_inds[i] <= N - 1
-    NOTE: Only consider the case in which all labels have same num of samples,
-        thus we can cope with all anchors in parallel.
     """
 
     assert len(dist_mat.size()) == 2
     assert dist_mat.size(0) == dist_mat.size(1)
     N = dist_mat.size(0)
 
+    if mining_available(dist_mat):
+        # small-N fast path: one fused kernel instead of 4-6 launches
+        p_inds, n_inds = hard_example_mining_cuda(dist_mat, labels)
+        dist_ap = dist_mat.gather(1, p_inds.unsqueeze(1)).squeeze(1)
+        dist_an = dist_mat.gather(1, n_inds.unsqueeze(1)).squeeze(1)
+        if return_inds:
+            return dist_ap, dist_an, p_inds, n_inds
+        return dist_ap, dist_an
+
     # shape [N, N]
-    is_pos = labels.expand(N, N).eq(labels.expand(N, N).t())
-    is_neg = labels.expand(N, N).ne(labels.expand(N, N).t())
+    L = labels.unsqueeze(1)
+    is_pos = L.eq(L.t())
+    is_neg = ~is_pos
 
     # `dist_ap` means distance(anchor, positive)
-    # both `dist_ap` and `relative_p_inds` with shape [N, 1]
-    dist_ap, relative_p_inds = torch.max(dist_mat[is_pos].contiguous().view(N, -1), 1, keepdim=True)
-    # `dist_an` means distance(anchor, negative)
-    # both `dist_an` and `relative_n_inds` with shape [N, 1]
-    dist_an, relative_n_inds = torch.min(dist_mat[is_neg].contiguous().view(N, -1), 1, keepdim=True)
-    # shape [N]
-    dist_ap = dist_ap.squeeze(1)
-    dist_an = dist_an.squeeze(1)
+    # `dist_an` means distance(anchor, negative); both with shape [N]
+    # mask out the other class with +/-inf so max/min reduce in one fused
+    # kernel per side, without the boolean-indexing reshape
+    neg_inf = torch.finfo(dist_mat.dtype).min
+    pos_inf = torch.finfo(dist_mat.dtype).max
+    # one scratch NxN buffer serves both masked reductions
+    scratch = dist_mat.masked_fill(is_neg, neg_inf)
+    dist_ap, p_inds = scratch.max(1)
+    scratch.copy_(dist_mat).masked_fill_(is_pos, pos_inf)
+    dist_an, n_inds = scratch.min(1)
 
     if return_inds:
-        # shape [N, N]
-        ind = (labels.new().resize_as_(labels).copy_(torch.arange(0, N).long()).unsqueeze(0).expand(N, N))
-        # shape [N, 1]
-        p_inds = torch.gather(ind[is_pos].contiguous().view(N, -1), 1, relative_p_inds.data)
-        n_inds = torch.gather(ind[is_neg].contiguous().view(N, -1), 1, relative_n_inds.data)
-        # shape [N]
-        p_inds = p_inds.squeeze(1)
-        n_inds = n_inds.squeeze(1)
+        # the argmax/argmin outputs are already absolute column indices
         return dist_ap, dist_an, p_inds, n_inds
 
     return dist_ap, dist_an
@@ -96,10 +109,11 @@ class TripletLoss(nn.Module):
         # shape [N, N]
         dist_mat = euclidean_dist(global_feat, global_feat)
         dist_ap, dist_an = hard_example_mining(dist_mat, labels)
-        y = dist_an.new().resize_as_(dist_an).fill_(1)
+        y = torch.ones_like(dist_an)
         if self.margin is not None:
             loss = self.ranking_loss(dist_an, dist_ap, y)
         else:
             loss = self.ranking_loss(dist_an - dist_ap, y)
-        prec = (dist_an.data > dist_ap.data).sum().float() / y.size(0)
+        with torch.no_grad():
+            prec = (dist_an > dist_ap).float().mean()
         return loss, prec, dist_ap, dist_an
@@ -0,0 +1,53 @@
+from __future__ import absolute_import
+
+import torch
+
+try:
+    import triton
+    import triton.language as tl
+except ImportError:  # triton is optional; triplet.py falls back to plain torch
+    triton = None
+
+# one program per row, whole row in a single block: only worth it for the
+# small N (batch_size x K) of triplet minibatches, where launch overhead
+# dominates the masked_fill/max/min sequence
+MAX_BLOCK_N = 1024
+
+
+def mining_available(dist_mat):
+    return triton is not None and dist_mat.is_cuda and dist_mat.size(0) <= MAX_BLOCK_N
+
+
+if triton is not None:
+    @triton.jit
+    def _hard_mining_kernel(dist_ptr, labels_ptr, p_ptr, n_ptr,
+                            N, stride, BLOCK: tl.constexpr):
+        row = tl.program_id(0)
+        cols = tl.arange(0, BLOCK)
+        mask = cols < N
+        d = tl.load(dist_ptr + row * stride + cols, mask=mask, other=0.)
+        label_i = tl.load(labels_ptr + row)
+        labels = tl.load(labels_ptr + cols, mask=mask, other=-1)
+        is_pos = (labels == label_i) & mask
+        d_pos = tl.where(is_pos, d, float('-inf'))
+        d_neg = tl.where(is_pos | ~mask, float('inf'), d)
+        tl.store(p_ptr + row, tl.argmax(d_pos, axis=0))
+        tl.store(n_ptr + row, tl.argmin(d_neg, axis=0))
+
+
+def hard_example_mining_cuda(dist_mat, labels):
+    """Fused hardest positive/negative search; one kernel for all rows.
+
+    Returns (p_inds, n_inds), the absolute column indices of the hardest
+    positive and negative per anchor. Values are left for the caller to
+    gather so gradients still flow through dist_mat.
+    """
+    N = dist_mat.size(0)
+    dist_mat = dist_mat.detach().contiguous()
+    labels = labels.contiguous()
+    p_inds = torch.empty(N, dtype=torch.long, device=dist_mat.device)
+    n_inds = torch.empty(N, dtype=torch.long, device=dist_mat.device)
+    _hard_mining_kernel[(N,)](dist_mat, labels, p_inds, n_inds,
+                              N, dist_mat.stride(0),
+                              BLOCK=triton.next_power_of_2(N))
+    return p_inds, n_inds
@@ -66,20 +66,18 @@ class Trainer(BaseTrainer):
             inputs, targets = self._parse_data(inputs)
             if isinstance(self.criterion, TripletLoss):
                 loss, prec1, dist_ap, dist_an = self._forward(inputs, targets)
-                # the proportion of triplets that satisfy margin
-                sm = (dist_an > dist_ap + margin).data.float().mean()
-                # average (anchor, positive) distance
-                d_ap = dist_ap.data.mean()
-                # average (anchor, negative) distance
-                d_an = dist_an.data.mean()
+                with torch.no_grad():
+                    # the proportion of triplets that satisfy margin
+                    sm = (dist_an > dist_ap + margin).float().mean()
+                    # average (anchor, positive) distance
+                    d_ap = dist_ap.mean()
+                    # average (anchor, negative) distance
+                    d_an = dist_an.mean()
                 prec_meter.update(prec1)
                 sm_meter.update(sm)
                 dist_ap_meter.update(d_ap)
                 dist_an_meter.update(d_an)
                 loss_meter.update(loss)
-                # tri_log = ('prec {:.2%}, sm {:.2%}, d_ap {:.4f}, d_an {:.4f}, loss {:.4f}'.format(
-                #     prec_meter.val, sm_meter.val, dist_ap_meter.val, dist_an_meter.val, loss_meter.val, ))
-                # print(tri_log)
             else:
                 loss, prec1 = self._forward(inputs, targets)
 
@@ -1,36 +1,63 @@
 from __future__ import print_function
 
+import os
 import os.path as osp
+import pickle
 
 import numpy as np
 
 from ..serialization import read_json
 
 
-def _pluck(identities, indices, relabel=False):
-    ret = []
-    for index, pid in enumerate(indices):
-        pid_images = identities[pid]
+def _index_identities(identities):
+    """Flatten the nested identities structure once into a
+    {pid: [(fname, camid), ...]} lookup, validating each filename as it goes.
+
+    `identities` is either the legacy dense list indexed by pid, or a compact
+    {str(pid): cams} mapping that only stores pids which have images."""
+    if isinstance(identities, dict):
+        items = sorted((int(pid), cams) for pid, cams in identities.items())
+    else:
+        items = enumerate(identities)
+    index_map = {}
+    for pid, pid_images in items:
+        images = []
         for camid, cam_images in enumerate(pid_images):
-            for fname in cam_images:
-                name = osp.splitext(fname)[0]
-                # x, y, _ = map(int, name.split('_'))
-                x, y, _ = name.split('_')
-                x = int(x)
-                if 'c' in y:
-                    y = int(y.split('c')[-1]) - 1
+            for entry in cam_images:
+                if isinstance(entry, (list, tuple)):
+                    # pre-parsed [fname, pid, camid] triple stored at
+                    # meta-creation time; no string work left to do
+                    fname, x, y = entry
+                    x, y = int(x), int(y)
                 else:
-                    y = int(y)
+                    fname = entry
+                    name = osp.splitext(fname)[0]
+                    # x, y, _ = map(int, name.split('_'))
+                    x, y, _ = name.split('_')
+                    x = int(x)
+                    if 'c' in y:
+                        y = int(y.split('c')[-1]) - 1
+                    else:
+                        y = int(y)
 
                 assert pid == x and camid == y
-                if relabel:
-                    ret.append((fname, index, camid))
-                else:
-                    ret.append((fname, pid, camid))
-    return ret
+                images.append((fname, camid))
+        if images:
+            index_map[pid] = images
+    return index_map
+
+
+def _pluck(index_map, indices, relabel=False):
+    return [(fname, index if relabel else int(pid), camid)
+            for index, pid in enumerate(indices)
+            for fname, camid in index_map.get(int(pid), ())]
 
 
 class Dataset(object):
+    # attributes materialized by load() and preserved in its disk cache
+    _cache_keys = ('meta', 'split', 'train', 'val', 'trainval', 'query', 'gallery',
+                   'num_train_ids', 'num_val_ids', 'num_trainval_ids')
+
     def __init__(self, root, split_id=0):
         self.root = root
         self.split_id = split_id
@@ -45,7 +72,32 @@ class Dataset(object):
         return osp.join(self.root, 'images')
 
     def load(self, num_val=0.3, verbose=True):
-        splits = read_json(osp.join(self.root, 'splits.json'))
+        # Skip JSON parsing + _pluck entirely when a cache from a previous
+        # run is still valid (keyed on the source file mtimes)
+        meta_path = osp.join(self.root, 'meta.json')
+        splits_path = osp.join(self.root, 'splits.json')
+        mtimes = (osp.getmtime(meta_path), osp.getmtime(splits_path))
+        cache_path = osp.join(self.root, 'load_cache_{}_{}.pkl'.format(self.split_id, num_val))
+        if osp.isfile(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = pickle.load(f)
+            except Exception:
+                # truncated/corrupt cache (e.g. a run killed mid-dump):
+                # treat as stale and rebuild
+                cached = {}
+            if cached.get('mtimes') == mtimes:
+                for key in self._cache_keys:
+                    setattr(self, key, cached[key])
+                if verbose:
+                    self._print_stats()
+                return
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+
+        splits = read_json(splits_path)
         if self.split_id >= len(splits):
             raise ValueError("split_id exceeds total splits {}"
                              .format(len(splits)))
@@ -61,37 +113,52 @@ class Dataset(object):
             raise ValueError("num_val exceeds total identities {}"
                              .format(num))
         if num_val:
-            train_pids = sorted(trainval_pids[:-num_val])
-            val_pids = sorted(trainval_pids[-num_val:])
+            train_pids = np.sort(trainval_pids[:-num_val])
+            val_pids = np.sort(trainval_pids[-num_val:])
         else:
-            train_pids = sorted(trainval_pids)
-            val_pids = sorted([])
-
-        self.meta = read_json(osp.join(self.root, 'meta.json'))
-        identities = self.meta['identities']
-        self.train = _pluck(identities, train_pids, relabel=True)
-        self.val = _pluck(identities, val_pids, relabel=True)
-        self.trainval = _pluck(identities, trainval_pids, relabel=True)
-        self.query = _pluck(identities, self.split['query'])
-        self.gallery = _pluck(identities, self.split['gallery'])
+            train_pids = np.sort(trainval_pids)
+            val_pids = trainval_pids[:0]
+
+        self.meta = read_json(meta_path)
+        index_map = _index_identities(self.meta['identities'])
+        self.train = _pluck(index_map, train_pids, relabel=True)
+        self.val = _pluck(index_map, val_pids, relabel=True)
+        self.trainval = _pluck(index_map, trainval_pids, relabel=True)
+        self.query = _pluck(index_map, self.split['query'])
+        self.gallery = _pluck(index_map, self.split['gallery'])
         self.num_train_ids = len(train_pids)
         self.num_val_ids = len(val_pids)
         self.num_trainval_ids = len(trainval_pids)
 
+        cached = {'mtimes': mtimes}
+        cached.update({key: getattr(self, key) for key in self._cache_keys})
+        try:
+            # write via a temp file + atomic rename so a partial dump is
+            # never visible under cache_path; skip caching on read-only roots
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
         if verbose:
-            print(self.__class__.__name__, "dataset loaded")
-            print("  subset   | # ids | # images")
-            print("  ---------------------------")
-            print("  train    | {:5d} | {:8d}"
-                  .format(self.num_train_ids, len(self.train)))
-            print("  val      | {:5d} | {:8d}"
-                  .format(self.num_val_ids, len(self.val)))
-            print("  trainval | {:5d} | {:8d}"
-                  .format(self.num_trainval_ids, len(self.trainval)))
-            print("  query    | {:5d} | {:8d}"
-                  .format(len(self.split['query']), len(self.query)))
-            print("  gallery  | {:5d} | {:8d}"
-                  .format(len(self.split['gallery']), len(self.gallery)))
+            self._print_stats()
+
+    def _print_stats(self):
+        print(self.__class__.__name__, "dataset loaded")
+        print("  subset   | # ids | # images")
+        print("  ---------------------------")
+        print("  train    | {:5d} | {:8d}"
+              .format(self.num_train_ids, len(self.train)))
+        print("  val      | {:5d} | {:8d}"
+              .format(self.num_val_ids, len(self.val)))
+        print("  trainval | {:5d} | {:8d}"
+              .format(self.num_trainval_ids, len(self.trainval)))
+        print("  query    | {:5d} | {:8d}"
+              .format(len(self.split['query']), len(self.query)))
+        print("  gallery  | {:5d} | {:8d}"
+              .format(len(self.split['gallery']), len(self.gallery)))
 
     def _check_integrity(self):
         return osp.isdir(osp.join(self.root, 'images')) and \
@@ -0,0 +1,20 @@
+from __future__ import absolute_import
+
+import os
+import os.path as osp
+
+
+def sorted_jpgs(path):
+    """List the '.jpg' names in a directory, sorted; [] if it is missing.
+
+    os.scandir + a suffix check beats glob's fnmatch for the flat '*.jpg'
+    filter. Hidden files are excluded to match glob, whose '*' never expands
+    over a leading dot (e.g. macOS '._*' sidecars in unpacked archives).
+    """
+    if path is None or not osp.isdir(path):
+        return []
+    with os.scandir(path) as it:
+        fnames = [e.name for e in it
+                  if e.name.endswith('.jpg') and not e.name.startswith('.')]
+    fnames.sort()
+    return fnames